@@ -1,10 +1,52 @@
 from __future__ import annotations
+import copy
+import functools
+import json
 import os
 from dataclasses import dataclass
-from dotenv import load_dotenv
+from pathlib import Path
+from dotenv import load_dotenv, find_dotenv
 import yaml
 
-load_dotenv()
+@functools.lru_cache(maxsize=1)
+def init_env() -> None:
+    """Load .env once per process: the one next to this file, else the nearest found."""
+    env_path = Path(__file__).with_name(".env")
+    if env_path.exists():
+        load_dotenv(dotenv_path=env_path, override=False)
+    else:
+        load_dotenv(find_dotenv(), override=False)
+
+init_env()
+
+# libyaml C loader when available (much faster parse), pure-Python otherwise
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+@functools.lru_cache(maxsize=8)
+def _load_yaml(path: str, mtime_ns: int) -> dict:
+    """
+    Parse `path` once per (path, mtime). A JSON sidecar (`<path>.cache.json`)
+    newer than the YAML is preferred, so later processes skip YAML parsing too.
+    """
+    sidecar = path + ".cache.json"
+    try:
+        if os.stat(sidecar).st_mtime_ns >= mtime_ns:
+            with open(sidecar, "r", encoding="utf-8") as f:
+                return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    with open(path, "r", encoding="utf-8") as f:
+        y = yaml.load(f, Loader=_YAML_LOADER) or {}
+
+    # Persist sidecar (best-effort)
+    try:
+        payload = json.dumps(y)
+        with open(sidecar, "w", encoding="utf-8") as f:
+            f.write(payload)
+    except (OSError, TypeError, ValueError):
+        pass
+    return y
 
 @dataclass
 class AppConfig:
@@ -20,8 +62,8 @@ class AppConfig:
 
     @staticmethod
     def load(path: str = "config.yaml") -> "AppConfig":
-        with open(path, "r", encoding="utf-8") as f:
-            y = yaml.safe_load(f)
+        # Copy so callers can't mutate the cached dict
+        y = copy.deepcopy(_load_yaml(path, os.stat(path).st_mtime_ns))
         return AppConfig(
             openai_api_key=os.getenv("OPENAI_API_KEY", ""),
             openai_model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
@@ -1,8 +1,15 @@
 from __future__ import annotations
+import asyncio
+import hashlib
 import json
 import os
-from typing import Dict
-from openai import OpenAI
+import sqlite3
+import threading
+import time
+from typing import Dict, List
+
+import backoff
+from openai import APIConnectionError, AsyncOpenAI, InternalServerError, RateLimitError
 
 JSON_SCHEMA = {
     "type": "object",
@@ -14,10 +21,29 @@ JSON_SCHEMA = {
     "additionalProperties": False
 }
 
+# Structured outputs need an object at the root, so the per-company
+# decisions are wrapped in {"decisions": [...]} and tagged with their index.
+BATCH_JSON_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "decisions": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"i": {"type": "integer"}, **JSON_SCHEMA["properties"]},
+                "required": ["i"] + JSON_SCHEMA["required"],
+                "additionalProperties": False,
+            },
+        }
+    },
+    "required": ["decisions"],
+    "additionalProperties": False
+}
+
 def _build_system_prompt(mode: str) -> str:
     core = (
         "You are an associate at a search fund.\n"
-        "Return STRICT JSON ONLY per schema. Decide if the company should be INCLUDED in the pipeline and give a 3–5 word industry tag."
+        "Return STRICT JSON ONLY per schema. Decide if each company should be INCLUDED in the pipeline and give each a 3–5 word industry tag."
     )
     rules = (
         "INCLUSION RULES:\n"
@@ -30,49 +56,189 @@ def _build_system_prompt(mode: str) -> str:
     strictness = f"STRICTNESS MODE: {mode.upper()} (balanced favors precision over recall; strict is most conservative)."
     return f"{core}\n\n{rules}\n{strictness}\n"
 
-def _build_user_prompt(thesis: dict, company: Dict[str, str]) -> str:
-    name = company.get("name", "").strip()
-    url = company.get("website", "").strip()
+def _build_user_prompt(thesis: dict, companies: List[Dict[str, str]]) -> str:
+    items = [
+        {"i": i, "name": (c.get("name") or "").strip(), "website": (c.get("website") or "").strip()}
+        for i, c in enumerate(companies)
+    ]
     return (
         "THESIS:\n"
         f"{json.dumps(thesis, indent=2)}\n\n"
         "TASK:\n"
-        "Respond EXACTLY as JSON: {\"include\": <bool>, \"industry_short\": <str>}.\n"
-        "COMPANY:\n"
-        f"Name: {name}\n"
-        f"Website: {url}\n"
+        "Judge EACH company below independently. Respond EXACTLY as JSON: "
+        "{\"decisions\": [{\"i\": <int>, \"include\": <bool>, \"industry_short\": <str>}, ...]} "
+        "with one entry per company, echoing its index i.\n"
+        "COMPANIES:\n"
+        f"{json.dumps(items, indent=2)}\n"
         "NOTES:\n"
         "- Favor inclusion only for true commercial entities; exclude associations/events unless substantial fee-for-service is evident.\n"
     )
 
+def _clean_decision(data: dict) -> Dict[str, str | bool]:
+    include = data.get("include")
+    industry = data.get("industry_short")
+    return {
+        "include": include if isinstance(include, bool) else False,
+        "industry_short": industry if isinstance(industry, str) and industry.strip() else "Unknown",
+    }
+
+def estimate_tokens(text: str, completion_tokens: int = 40) -> int:
+    """Rough token count (~4 chars/token) plus headroom for the short JSON reply."""
+    return len(text) // 4 + completion_tokens
+
+class RateLimiter:
+    """
+    Proactive requests-per-minute / tokens-per-minute token bucket.
+    Capacity refills continuously from wall-clock time; `acquire` waits until
+    both buckets can cover the request. Not bound to any event loop.
+    """
+    def __init__(self, rpm: int, tpm: int):
+        self.max_requests = float(rpm)
+        self.max_tokens = float(tpm)
+        self.available_request_capacity = self.max_requests
+        self.available_token_capacity = self.max_tokens
+        self._last = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._last
+        self._last = now
+        self.available_request_capacity = min(
+            self.max_requests, self.available_request_capacity + self.max_requests * elapsed / 60.0
+        )
+        self.available_token_capacity = min(
+            self.max_tokens, self.available_token_capacity + self.max_tokens * elapsed / 60.0
+        )
+
+    async def acquire(self, estimated_tokens: int) -> None:
+        tokens = min(float(estimated_tokens), self.max_tokens)
+        while True:
+            self._refill()
+            if self.available_request_capacity >= 1 and self.available_token_capacity >= tokens:
+                self.available_request_capacity -= 1
+                self.available_token_capacity -= tokens
+                return
+            # Sleep roughly until the scarcer bucket has enough capacity
+            need_req = max(0.0, 1 - self.available_request_capacity) * 60.0 / self.max_requests
+            need_tok = max(0.0, tokens - self.available_token_capacity) * 60.0 / self.max_tokens
+            await asyncio.sleep(max(0.01, need_req, need_tok))
+
 class GPTFilter:
     def __init__(self, api_key: str, model: str, thesis: dict):
-        self.client = OpenAI(api_key=api_key)
+        self.api_key = api_key
         self.model = model
         self.thesis = thesis
         self.mode = os.getenv("GPT_INCLUSION_MODE", "balanced").strip().lower()
         if self.mode not in {"balanced", "strict"}:
             self.mode = "balanced"
+        self.concurrency = int(os.getenv("GPT_CONCURRENCY", "20"))
+        # Companies packed into one request (fewer requests when RPM-bound)
+        self.batch_size = max(1, int(os.getenv("GPT_BATCH_SIZE", "20")))
+        self.limiter = RateLimiter(
+            rpm=int(os.getenv("OPENAI_RPM_LIMIT", "500")),
+            tpm=int(os.getenv("OPENAI_TPM_LIMIT", "200000")),
+        )
+
+        # Persistent decision cache so re-runs skip already-classified companies
+        self._thesis_hash = hashlib.sha256(json.dumps(thesis, sort_keys=True).encode()).hexdigest()
+        self._db = sqlite3.connect(os.getenv("GPT_CACHE_PATH", "gpt_cache.sqlite"), check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS d(k TEXT PRIMARY KEY, v TEXT)")
+        self._db_lock = threading.Lock()
+        self._pending_writes = 0
+
+    def _cache_key(self, company: Dict[str, str]) -> str:
+        parts = [
+            (company.get("name") or "").strip(),
+            (company.get("website") or "").strip(),
+            self.model,
+            self.mode,
+            self._thesis_hash,
+        ]
+        return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+    def _cache_get(self, key: str) -> Dict[str, str | bool] | None:
+        with self._db_lock:
+            row = self._db.execute("SELECT v FROM d WHERE k=?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _cache_put(self, key: str, data: Dict[str, str | bool]) -> None:
+        with self._db_lock:
+            self._db.execute("INSERT OR REPLACE INTO d(k, v) VALUES (?, ?)", (key, json.dumps(data)))
+            self._pending_writes += 1
+            if self._pending_writes >= 20:
+                self._db.commit()
+                self._pending_writes = 0
+
+    def flush_cache(self) -> None:
+        with self._db_lock:
+            if self._pending_writes:
+                self._db.commit()
+                self._pending_writes = 0
+
+    # The only retry layer (the client is built with max_retries=0); covers what the SDK would have retried
+    @backoff.on_exception(backoff.expo, (RateLimitError, APIConnectionError, InternalServerError), max_tries=3)
+    async def _create(self, client: AsyncOpenAI, sys_prompt: str, user_prompt: str, n_companies: int):
+        await self.limiter.acquire(estimate_tokens(sys_prompt + user_prompt, completion_tokens=40 * n_companies))
+        return await client.chat.completions.create(
+            model=self.model,
+            temperature=0,
+            response_format={"type": "json_schema", "json_schema": {"name": "Decisions", "schema": BATCH_JSON_SCHEMA, "strict": True}},
+            messages=[
+                {"role": "system", "content": sys_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+        )
+
+    async def _decide_chunk(self, client: AsyncOpenAI, companies: List[Dict[str, str]]) -> List[Dict[str, str | bool]]:
+        """One request for every uncached company in `companies`; order is preserved by index."""
+        keys = [self._cache_key(c) for c in companies]
+        out: List[Dict[str, str | bool] | None] = [self._cache_get(k) for k in keys]
+        misses = [i for i, d in enumerate(out) if d is None]
+
+        if misses:
+            sys_prompt = _build_system_prompt(self.mode)
+            user_prompt = _build_user_prompt(self.thesis, [companies[i] for i in misses])
+            try:
+                resp = await self._create(client, sys_prompt, user_prompt, len(misses))
+                data = json.loads(resp.choices[0].message.content)
+                for item in data.get("decisions") or []:
+                    j = item.get("i")
+                    if not isinstance(j, int) or not 0 <= j < len(misses):
+                        continue
+                    decision = _clean_decision(item)
+                    out[misses[j]] = decision
+                    # Only real answers are cached; API failures fall through and are retried next run
+                    self._cache_put(keys[misses[j]], decision)
+            except Exception:
+                pass
+
+        return [d if d is not None else {"include": False, "industry_short": "Unknown"} for d in out]
+
+    async def decide_many(self, companies: List[Dict[str, str]], concurrency: int | None = None) -> List[Dict[str, str | bool]]:
+        """
+        Decide for all companies, `batch_size` per request and at most
+        `concurrency` requests in flight. Results are returned in the same
+        order as `companies`.
+        """
+        sem = asyncio.Semaphore(concurrency or self.concurrency)
+        chunks = [companies[i:i + self.batch_size] for i in range(0, len(companies), self.batch_size)]
+        # The async client is bound to the running event loop, so open one per batch
+        # max_retries=0: retries belong to the backoff decorator on _create, so each attempt goes through the limiter
+        async with AsyncOpenAI(api_key=self.api_key, max_retries=0) as client:
+            async def guarded(chunk: List[Dict[str, str]]):
+                async with sem:
+                    return await self._decide_chunk(client, chunk)
+
+            try:
+                results = await asyncio.gather(*(guarded(c) for c in chunks))
+            finally:
+                self.flush_cache()
+        return [d for chunk in results for d in chunk]
+
+    def decide_batch(self, companies: List[Dict[str, str]]) -> List[Dict[str, str | bool]]:
+        """Blocking wrapper around decide_many."""
+        return asyncio.run(self.decide_many(companies))
 
     def decide(self, company: Dict[str, str]) -> Dict[str, str | bool]:
-        sys_prompt = _build_system_prompt(self.mode)
-        user_prompt = _build_user_prompt(self.thesis, company)
-        try:
-            resp = self.client.chat.completions.create(
-                model=self.model,
-                temperature=0,
-                response_format={"type": "json_schema", "json_schema": {"name": "Decision", "schema": JSON_SCHEMA, "strict": True}},
-                messages=[
-                    {"role": "system", "content": sys_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-            )
-            content = resp.choices[0].message.content
-            data = json.loads(content)
-            if not isinstance(data.get("include"), bool):
-                data["include"] = False
-            if not isinstance(data.get("industry_short"), str) or not data.get("industry_short").strip():
-                data["industry_short"] = "Unknown"
-            return data
-        except Exception:
-            return {"include": False, "industry_short": "Unknown"}
+        """Blocking single-company wrapper around decide_many."""
+        return asyncio.run(self.decide_many([company], concurrency=1))[0]
@@ -0,0 +1,24 @@
+from __future__ import annotations
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def build_session(headers: Dict[str, str], pool_connections: int = 32, pool_maxsize: int = 64) -> requests.Session:
+    """
+    Shared keep-alive session: one connection pool per host, reused across
+    requests (and threads), with a couple of quick retries on gateway errors.
+    """
+    session = requests.Session()
+    session.headers.update(headers)
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        # raise_on_status=False hands back the last response instead of raising
+        max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504], raise_on_status=False),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
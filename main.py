@@ -1,36 +1,39 @@
 from __future__ import annotations
+import asyncio
+import importlib
 import os
+import re
+import sqlite3
 import sys
+import threading
 import time
-import signal
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple, Optional
 from urllib.parse import urlparse, urlunparse
 
-import requests
+import aiohttp
 
-from config import AppConfig
+from config import AppConfig, init_env
 from gpt_filter import GPTFilter
 from sheets import SheetWriter
-from scrapers.uspaacc import USPAACCScraper
-from scrapers.aacc import AACCScraper
 from search_resolver import SearchResolver
-from scrapers.aaccil import AACCILScraper
+from scrapers.browser import close_browser
 
-from pathlib import Path
-from dotenv import load_dotenv
-load_dotenv(dotenv_path=Path(__file__).with_name(".env"), override=False)
+init_env()
 
-if not Path(__file__).with_name(".env").exists():
-    from dotenv import find_dotenv
-    load_dotenv(find_dotenv(), override=False)
-
-# Register all scrapers here
+# Register all scrapers here ("module:Class"; imported only when selected,
+# so e.g. aaccil never pays for the Playwright import)
 SCRAPER_REGISTRY = {
-    "uspaacc": USPAACCScraper,
-    "aacc": AACCScraper,
-    "aaccil": AACCILScraper,            
+    "uspaacc": "scrapers.uspaacc:USPAACCScraper",
+    "aacc": "scrapers.aacc:AACCScraper",
+    "aaccil": "scrapers.aaccil:AACCILScraper",
 }
 
+
+def _load_scraper_cls(scraper_key: str):
+    mod, cls = SCRAPER_REGISTRY[scraper_key].split(":")
+    return getattr(importlib.import_module(mod), cls)
+
 HEADERS = {
     "User-Agent": (
         "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
@@ -39,6 +42,7 @@ HEADERS = {
 }
 
 TIMEOUT_SECS = int(os.getenv("URL_CHECK_TIMEOUT_SECS", "10"))
+CONNECT_TIMEOUT_SECS = 3.05  # fail fast on unreachable hosts; TIMEOUT_SECS bounds the whole request
 DROP_DEAD_LINKS = os.getenv("DROP_DEAD_LINKS", "1") == "1"
 ALLOW_HTTP = os.getenv("ALLOW_HTTP", "0") == "1"
 
@@ -46,10 +50,30 @@ ALLOW_HTTP = os.getenv("ALLOW_HTTP", "0") == "1"
 PER_COMPANY_BUDGET_SECS = float(os.getenv("PER_COMPANY_BUDGET_SECS", "15"))
 # How much of the budget to allocate to search resolution (rest goes to live check + GPT)
 RESOLVER_BUDGET_FRACTION = float(os.getenv("RESOLVER_BUDGET_FRACTION", "0.65"))
+# Per-company search budget; SearchResolver derives its retry limit and request timeouts from it
+SEARCH_BUDGET_SECS = max(1.0, PER_COMPANY_BUDGET_SECS * RESOLVER_BUDGET_FRACTION)
 MIN_RESOLVER_SCORE = int(os.getenv("MIN_RESOLVER_SCORE", "35"))  # lower to 30 if too strict
 
-# Use Unix signal-based hard timeouts (works on macOS/Linux main thread)
-USE_SIGNAL_TIMEOUT = os.getenv("USE_SIGNAL_TIMEOUT", "1") == "1"
+# Companies resolved concurrently (search is network-bound)
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "16"))
+# Max companies queued or in flight between the scraper and the resolve workers
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "64"))
+# Concurrent URL liveness checks
+LIVE_CHECK_CONCURRENCY = int(os.getenv("LIVE_CHECK_CONCURRENCY", "32"))
+
+# Max rows per Sheets write
+SHEETS_BATCH_ROWS = int(os.getenv("SHEETS_BATCH_ROWS", "500"))
+
+# Persistent liveness cache; results younger than the TTL are reused across runs
+URL_CACHE_TTL_SECS = int(os.getenv("URL_CACHE_TTL_SECS", str(7 * 86400)))
+_URL_CACHE = sqlite3.connect(os.getenv("URL_CACHE_PATH", "url_cache.sqlite"))
+_URL_CACHE.execute("CREATE TABLE IF NOT EXISTS u(url TEXT PRIMARY KEY, live INT, final TEXT, status INT, ts INT)")
+# Only answers that won't change on a retry are cached; 5xx, 429, 403 bot walls etc. are re-checked next run
+_CACHEABLE_DEAD_STATUSES = frozenset({404, 410})
+
+
+def _is_cacheable_status(status: Optional[int]) -> bool:
+    return status is not None and (200 <= status < 400 or status in _CACHEABLE_DEAD_STATUSES)
 
 
 def _normalize_url(url: str) -> Optional[str]:
@@ -59,7 +83,10 @@ def _normalize_url(url: str) -> Optional[str]:
     lo = url.lower()
     if lo.startswith(("mailto:", "tel:", "javascript:", "data:", "about:")):
         return None
-    parsed = urlparse(url if "://" in url else f"https://{url}")
+    try:
+        parsed = urlparse(url if "://" in url else f"https://{url}")
+    except ValueError:  # e.g. "Invalid IPv6 URL"
+        return None
     if parsed.scheme not in ("http", "https") or not parsed.netloc:
         return None
     scheme = parsed.scheme
@@ -69,61 +96,110 @@ def _normalize_url(url: str) -> Optional[str]:
     return urlunparse(cleaned)
 
 
-def _check_url_live(url: str, timeout: int = TIMEOUT_SECS):
-    try:
-        head = requests.head(url, headers=HEADERS, allow_redirects=True, timeout=timeout)
-        if 200 <= head.status_code < 400:
-            return True, head.url, head.status_code
-        if head.status_code in (400, 401, 403, 405, 500):
-            get = requests.get(
-                url, headers=HEADERS, allow_redirects=True, timeout=timeout, stream=True
-            )
-            sc2, final2 = get.status_code, get.url
-            try:
-                get.close()
-            except Exception:
-                pass
-            if 200 <= sc2 < 400:
-                return True, final2, sc2
-        return False, head.url, head.status_code
-    except requests.RequestException:
-        return False, url, None
+async def check_urls(urls: List[str], concurrency: int = LIVE_CHECK_CONCURRENCY) -> List[Tuple[bool, str, Optional[int]]]:
+    """
+    Liveness-check all URLs concurrently; returns (is_live, final_url, status)
+    per URL in input order. Each check is a single GET whose body is never
+    read, so the status and post-redirect URL come from the headers alone.
+    """
+    sem = asyncio.Semaphore(concurrency)
+    timeout = aiohttp.ClientTimeout(total=TIMEOUT_SECS, sock_connect=CONNECT_TIMEOUT_SECS)
+    connector = aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+
+    async with aiohttp.ClientSession(headers=HEADERS, timeout=timeout, connector=connector) as session:
+        async def check(url: str) -> Tuple[bool, str, Optional[int]]:
+            async with sem:
+                try:
+                    async with session.get(url, allow_redirects=True) as r:
+                        return 200 <= r.status < 400, str(r.url), r.status
+                except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                    return False, url, None
+
+        return list(await asyncio.gather(*(check(u) for u in urls)))
+
+
+def check_urls_cached(urls: List[str], refresh: bool = False) -> List[Tuple[bool, str, Optional[int]]]:
+    """
+    check_urls() behind the on-disk cache: fresh entries are served from
+    SQLite, only the rest hit the network. `refresh` ignores cached entries.
+    Only definitive answers (2xx/3xx, 404/410) are cached; timeouts, DNS
+    errors and transient statuses (5xx, 429, 403, ...) are re-checked next run.
+    """
+    now = int(time.time())
+    results: dict = {}
+    if not refresh:
+        for url in set(urls):
+            row = _URL_CACHE.execute("SELECT live, final, status, ts FROM u WHERE url=?", (url,)).fetchone()
+            # Status re-checked so rows written before the filter (e.g. a cached 503) are ignored
+            if row and now - row[3] < URL_CACHE_TTL_SECS and _is_cacheable_status(row[2]):
+                results[url] = (bool(row[0]), row[1], row[2])
+
+    misses = list(dict.fromkeys(u for u in urls if u not in results))
+    if misses:
+        for url, res in zip(misses, asyncio.run(check_urls(misses))):
+            results[url] = res
+            if _is_cacheable_status(res[2]):
+                _URL_CACHE.execute(
+                    "INSERT OR REPLACE INTO u(url, live, final, status, ts) VALUES (?, ?, ?, ?, ?)",
+                    (url, int(res[0]), res[1], res[2], now),
+                )
+        _URL_CACHE.commit()
 
+    return [results[u] for u in urls]
 
-def _contains_any(s: str, needles: List[str]) -> bool:
-    lo = (s or "").lower()
-    return any(n in lo for n in needles)
+
+def _compile_needles(needles: List[str]) -> Optional[re.Pattern]:
+    """One alternation regex over all needles, so a URL is scanned once; None if empty."""
+    needles = sorted({n.lower() for n in needles if n}, key=len, reverse=True)
+    if not needles:
+        return None
+    return re.compile("|".join(re.escape(n) for n in needles))
 
 
-# ---- Hard timeout helpers (Unix) ----
-class _Timeout(Exception):
-    pass
+def _contains_any(s: str, needles: Optional[re.Pattern]) -> bool:
+    return bool(needles and needles.search((s or "").lower()))
 
 
-def _sigalrm_handler(signum, frame):
-    raise _Timeout()
+# (row, preview_row, outcome) for one company; outcome feeds the summary counters
+CompanyResult = Tuple[Optional[List[str]], Optional[Tuple[str, str, str, str]], str]
 
 
-def _run_with_alarm(seconds: float, fn, *args, **kwargs):
-    """Run fn(...) with a hard timeout using SIGALRM. Unix/macOS only."""
-    # SIGALRM only takes integer seconds
-    secs = max(1, int(seconds))
-    prev_handler = signal.getsignal(signal.SIGALRM)
+def _resolve_company(company: dict, resolver, blacklist: Optional[re.Pattern]) -> CompanyResult:
+    """
+    Search-resolve a single company's website. Runs on a worker thread and
+    calls the resolver directly, so every search has finished by the time the
+    pool is joined (and the resolver closed). The resolver itself keeps each
+    search within SEARCH_BUDGET_SECS; whatever it finds is used, and a search
+    that gave up is not cached, so it is retried next run.
+    A surviving company comes back as a [name, industry, link] row that still
+    awaits the live check and GPT filter.
+    """
+    name = (company.get("name") or "").strip()
+
     try:
-        signal.signal(signal.SIGALRM, _sigalrm_handler)
-        signal.alarm(secs)
-        return fn(*args, **kwargs)
-    finally:
-        signal.alarm(0)
-        signal.signal(signal.SIGALRM, prev_handler)
+        website = resolver.resolve(name, min_score=MIN_RESOLVER_SCORE)
+    except Exception:
+        website = None
+
+    if not website:
+        return None, (name, "Unknown", "", "No site found via search"), "no_site"
+
+    link = _normalize_url(website)
+    if not link:
+        return None, (name, "Unknown", website, "SKIP: non-http(s)"), "skipped"
 
+    if _contains_any(link, blacklist):
+        return None, (name, "Unknown", link, "SKIP: blacklist domain"), "skipped"
 
-def run(scraper_key: str):
+    return [name, "TBD", link], None, "resolved"
+
+
+def run(scraper_key: str, refresh_cache: bool = False):
     cfg = AppConfig.load()
     if scraper_key not in SCRAPER_REGISTRY:
         raise SystemExit(f"Unknown scraper '{scraper_key}'. Options: {list(SCRAPER_REGISTRY.keys())}")
 
-    scraper_cls = SCRAPER_REGISTRY[scraper_key]
+    scraper_cls = _load_scraper_cls(scraper_key)
     scfg = cfg.scrapers.get(scraper_key, {})
     url = scfg.get("url")
     if not url:
@@ -141,7 +217,7 @@ def run(scraper_key: str):
     )
 
     # Website resolver (search)
-    resolver = SearchResolver()
+    resolver = SearchResolver(budget_secs=SEARCH_BUDGET_SECS)
 
     # GPT (optional)
     gpt = None
@@ -157,7 +233,7 @@ def run(scraper_key: str):
             raise SystemExit("GOOGLE_SHEET_ID not set. Fill .env.")
         sheet = SheetWriter(sheet_id=cfg.sheet_id, tab_name=cfg.sheet_tab)
 
-    blacklist_substrings = [b.lower() for b in scfg.get("blacklist_domains", [])]
+    blacklist = _compile_needles(scfg.get("blacklist_domains") or [])
 
     rows: List[List[str]] = []
     preview_rows: List[Tuple[str, str, str, str]] = []
@@ -165,71 +241,51 @@ def run(scraper_key: str):
 
     max_items = cfg.max_companies or scfg.get("max_listings")
 
-    for company in scraper.iter_companies(max_items=max_items):
-        start_ts = time.monotonic()
-        name = (company.get("name") or "").strip()
-        if not name:
-            continue
-        count_total += 1
-
-        # ---- 1) Resolve website via search (hard time budget on Unix) ----
-        website = None
-        search_budget = max(1.0, PER_COMPANY_BUDGET_SECS * RESOLVER_BUDGET_FRACTION)
-
+    # ---- 1) Resolve websites via search: fan out the I/O-bound work on a thread pool ----
+    # Companies are submitted as the scraper yields them, so searching overlaps
+    # with scraping. The scraper stays on the main thread (Playwright's sync API
+    # is thread-bound); `slots` bounds how many companies may be queued or in
+    # flight, pausing the scraper when resolving falls behind.
+    resolved: List[List[str]] = []
+    slots = threading.BoundedSemaphore(PIPELINE_QUEUE_SIZE)
+    futures = []
+    with ThreadPoolExecutor(max_workers=PIPELINE_WORKERS) as pool:
         try:
-            if USE_SIGNAL_TIMEOUT and hasattr(signal, "SIGALRM"):
-                website = _run_with_alarm(
-                    search_budget,
-                    resolver.resolve,
-                    name,
-                    min_score=MIN_RESOLVER_SCORE,
-                )
-            else:
-                # Soft budget fallback: just call; we'll check total elapsed later
-                website = resolver.resolve(name, min_score=MIN_RESOLVER_SCORE)
-        except _Timeout:
-            preview_rows.append((name, "Unknown", "", f"Timed out (> {int(search_budget)}s) during search"))
-            continue
-        except Exception:
-            website = None
-
-        if not website:
-            count_no_site += 1
-            preview_rows.append((name, "Unknown", "", "No site found via search"))
-            continue
-
-        link = _normalize_url(website)
-        if not link:
-            preview_rows.append((name, "Unknown", website, "SKIP: non-http(s)"))
-            continue
-
-        if _contains_any(link, blacklist_substrings):
-            preview_rows.append((name, "Unknown", link, "SKIP: blacklist domain"))
-            continue
-
-        # If we already overspent budget (soft fallback path), bail
-        if (time.monotonic() - start_ts) > PER_COMPANY_BUDGET_SECS and not USE_SIGNAL_TIMEOUT:
-            preview_rows.append((name, "Unknown", link, f"Timed out (> {PER_COMPANY_BUDGET_SECS:.0f}s) during search"))
-            continue
-
-        # ---- 2) Live check (hard timeout using alarm with remaining budget) ----
-        remaining = PER_COMPANY_BUDGET_SECS - (time.monotonic() - start_ts)
-        if remaining <= 0 and not USE_SIGNAL_TIMEOUT:
-            preview_rows.append((name, "Unknown", link, "Timed out before live check"))
-            continue
-        live_budget = max(1.0, min(remaining, TIMEOUT_SECS))
-
-        try:
-            if USE_SIGNAL_TIMEOUT and hasattr(signal, "SIGALRM"):
-                is_live, final_url, status = _run_with_alarm(
-                    live_budget, _check_url_live, link, int(live_budget)
-                )
-            else:
-                is_live, final_url, status = _check_url_live(link, int(live_budget))
-        except _Timeout:
-            preview_rows.append((name, "Unknown", link, f"Timed out (> {int(live_budget)}s) during live check"))
-            continue
-
+            for company in scraper.iter_companies(max_items=max_items):
+                if not (company.get("name") or "").strip():
+                    continue
+                count_total += 1
+                slots.acquire()
+                fut = pool.submit(_resolve_company, company, resolver, blacklist)
+                fut.add_done_callback(lambda _: slots.release())
+                futures.append((company, fut))
+        finally:
+            # Stop Playwright as soon as scraping is done: its sync API leaves an
+            # event loop marked as running on this thread, which would make the
+            # asyncio.run() calls below fail
+            close_browser()
+
+        # Submission order, so Sheets rows and the preview follow scrape order
+        for company, fut in futures:
+            try:
+                row, preview, outcome = fut.result()
+            except Exception as e:
+                # Report it like any other skip instead of silently dropping the company
+                name = (company.get("name") or "").strip()
+                row, preview, outcome = None, (name, "Unknown", "", f"ERROR: {type(e).__name__}: {e}"), "skipped"
+
+            if preview:
+                preview_rows.append(preview)
+            if outcome == "no_site":
+                count_no_site += 1
+            if row:
+                resolved.append(row)
+    resolver.close()
+
+    # ---- 2) Live check: every resolved URL in one concurrent pass ----
+    candidates: List[List[str]] = []
+    statuses = check_urls_cached([link for _, _, link in resolved], refresh=refresh_cache) if resolved else []
+    for (name, industry, link), (is_live, final_url, status) in zip(resolved, statuses):
         if not is_live:
             preview_rows.append((name, "Unknown", link, f"DEAD link (status={status})"))
             if DROP_DEAD_LINKS:
@@ -237,35 +293,27 @@ def run(scraper_key: str):
                 continue
         else:
             link = final_url
+        candidates.append([name, industry, link])
 
-        # ---- 3) GPT filter: include + 3–5 word industry (use whatever time remains) ----
-        industry = "Unknown"
-        include = True
-        if gpt is not None:
-            # Keep GPT call quick—let OpenAI handle internal timeouts
-            decision = gpt.decide({"name": name, "website": link})
+    # ---- 3) GPT filter: include + 3–5 word industry, all calls in one concurrent batch ----
+    if gpt is not None and candidates:
+        decisions = asyncio.run(gpt.decide_many([{"name": n, "website": l} for n, _, l in candidates]))
+        for (name, _, link), decision in zip(candidates, decisions):
             include = bool(decision.get("include", False))
             industry = (decision.get("industry_short") or "Unknown").strip()
-        else:
-            industry = "TBD"
-            include = True
-
-        if not include:
-            preview_rows.append((name, industry, link, "Filtered out by GPT"))
-            continue
-
-        rows.append([name, industry, link])
-        count_included += 1
-
-        if sheet and len(rows) >= 50:
-            sheet.append_rows(rows)
-            rows.clear()
-
-        # soft rate-limit
-        time.sleep(0.03)
+            if not include:
+                preview_rows.append((name, industry, link, "Filtered out by GPT"))
+                continue
+            rows.append([name, industry, link])
+    else:
+        rows.extend(candidates)
+    count_included = len(rows)
 
-    if sheet and rows:
-        sheet.append_rows(rows)
+    # Sheets: rows are buffered for the whole run and written at the end
+    # (one call, or a few SHEETS_BATCH_ROWS-sized calls for very large runs)
+    if sheet:
+        for i in range(0, len(rows), SHEETS_BATCH_ROWS):
+            sheet.append_rows(rows[i:i + SHEETS_BATCH_ROWS])
 
     if not sheet:
         preview_n = 25
@@ -293,10 +341,14 @@ def run(scraper_key: str):
         "drop_dead_links": DROP_DEAD_LINKS,
         "per_company_budget_secs": PER_COMPANY_BUDGET_SECS,
         "resolver_budget_fraction": RESOLVER_BUDGET_FRACTION,
+        "search_budget_secs": SEARCH_BUDGET_SECS,
+        "pipeline_workers": PIPELINE_WORKERS,
     })
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        raise SystemExit("Usage: python main.py <scraper_key>  # e.g., python main.py uspaacc | aacc")
-    run(sys.argv[1])
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    flags = {a for a in sys.argv[1:] if a.startswith("--")}
+    if len(args) < 1:
+        raise SystemExit("Usage: python main.py <scraper_key> [--refresh-cache]  # e.g., python main.py uspaacc | aacc")
+    run(args[0], refresh_cache="--refresh-cache" in flags)
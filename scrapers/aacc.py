@@ -1,12 +1,10 @@
 from __future__ import annotations
 import os
 import time
-from typing import Iterable, Optional, List
-
-from playwright.sync_api import sync_playwright
-from bs4 import BeautifulSoup, Tag
+from typing import Iterable, List
 
 from scraper_base import Scraper, Company
+from scrapers.browser import TEXTS_JS, block_heavy_resources, get_browser, scroll_until_stable
 
 # The page uses anchors like:
 # <a class="popup-modal" href="/membership-directory/corporate/2745907#page-member-ajax">
@@ -35,10 +33,6 @@ IGNORE_LABELS = {
 DEBUG = os.getenv("SCRAPER_DEBUG", "0") == "1"
 
 
-def _text(el: Tag) -> str:
-    return (el.get_text(strip=True) or "").strip()
-
-
 class AACCScraper(Scraper):
     """
     Playwright-based scraper for the AACC corporate directory:
@@ -60,61 +54,44 @@ class AACCScraper(Scraper):
         self.name_selectors: List[str] = list(
             dict.fromkeys([name_selector] + ALT_NAME_SELECTORS)
         )
-        self.scroll_rounds = 22  # a few extra scrolls to load more cards
+        self.scroll_rounds = 22  # upper bound on scrolls; usually stops earlier
 
     # ---------- Playwright helpers ----------
     def _open_page(self):
-        pw = sync_playwright().start()
-        browser = pw.chromium.launch(headless=True)
-        ctx = browser.new_context()
+        ctx = get_browser().new_context()
         page = ctx.new_page()
-        return pw, browser, ctx, page
+        page.route("**/*", block_heavy_resources)
+        return ctx, page
 
-    def _close_page(self, pw, browser, ctx):
-        try:
-            ctx.close()
-            browser.close()
-        finally:
-            pw.stop()
+    def _close_page(self, ctx):
+        ctx.close()
 
     # ---------- Public API ----------
     def iter_companies(self, max_items: int | None = None) -> Iterable[Company]:
-        pw, browser, ctx, page = self._open_page()
+        ctx, page = self._open_page()
         try:
             page.goto(self.url, wait_until="domcontentloaded", timeout=60000)
 
-            # Lazy-load by scrolling
-            prev_h = 0
-            for _ in range(self.scroll_rounds):
-                page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                page.wait_for_timeout(700)
-                cur_h = page.evaluate("document.body.scrollHeight")
-                if cur_h == prev_h:
-                    break
-                prev_h = cur_h
-
-            page.wait_for_load_state("networkidle", timeout=6000)
-            html = page.content()
-            soup = BeautifulSoup(html, "html.parser")
+            # Lazy-load by scrolling, until no new name anchors show up
+            scroll_until_stable(page, ", ".join(self.name_selectors), max_rounds=self.scroll_rounds)
 
-            # Find candidate name nodes
-            nodes: List[Tag] = []
+            # Read candidate names straight from the live DOM
+            labels: List[str] = []
             used_css = ""
             for css in self.name_selectors:
-                cand = soup.select(css)
+                cand = page.eval_on_selector_all(css, TEXTS_JS)
                 if cand:
-                    nodes = cand
+                    labels = cand
                     used_css = css
                     break
 
             if DEBUG:
-                print(f"[AACC DEBUG] name_nodes found: {len(nodes)} using selector: {used_css}")
+                print(f"[AACC DEBUG] name_nodes found: {len(labels)} using selector: {used_css}")
 
             seen = set()
             count = 0
 
-            for el in nodes:
-                label = _text(el)
+            for label in labels:
                 if not label:
                     continue
 
@@ -141,4 +118,4 @@ class AACCScraper(Scraper):
                 time.sleep(0.02)
 
         finally:
-            self._close_page(pw, browser, ctx)
+            self._close_page(ctx)
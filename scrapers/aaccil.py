@@ -1,14 +1,15 @@
 from __future__ import annotations
 import os
 import re
-import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Iterable, Optional, List, Set
 
 import requests
-from bs4 import BeautifulSoup, Tag
+from bs4 import BeautifulSoup, SoupStrainer, Tag
 from urllib.parse import urljoin, urlparse, parse_qs, urlencode, urlunparse
 
 from scraper_base import Scraper, Company
+from http_session import build_session
 
 HEADERS = {
     "User-Agent": (
@@ -16,9 +17,20 @@ HEADERS = {
         "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0 Safari/537.36"
     )
 }
+SESSION = build_session(HEADERS)
 DEBUG = os.getenv("SCRAPER_DEBUG", "0") == "1"
 REQUEST_TIMEOUT = int(os.getenv("AACCIL_REQUEST_TIMEOUT_SECS", "15"))
-REQUEST_DELAY = float(os.getenv("AACCIL_REQUEST_DELAY_SECS", "0.2"))  # polite crawl
+CONNECT_TIMEOUT = 3.05
+FETCH_WORKERS = int(os.getenv("AACCIL_FETCH_WORKERS", "8"))  # polite crawl: bounded parallelism
+
+_PAGE_RX = re.compile(r"Page\s+\d+\s+of\s+(\d+)", re.I)
+
+# Parse only what each pass needs: anchors for names, the pager block for page count
+ANCHOR_STRAINER = SoupStrainer("a", href=True)
+PAGINATION_STRAINER = SoupStrainer(class_=["wp-pagenavi", "pagination"])
+
+# Any anchors with these labels should be ignored (case-insensitive)
+IGNORE_LABELS = frozenset({"more info", "learn more", "view more", "view details", "details", "profile"})
 
 
 def _text(el: Tag) -> str:
@@ -62,7 +74,7 @@ class AACCILScraper(Scraper):
 
     def _fetch_html(self, url: str) -> Optional[str]:
         try:
-            r = requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
+            r = SESSION.get(url, timeout=(CONNECT_TIMEOUT, REQUEST_TIMEOUT))
             if r.status_code != 200:
                 return None
             return r.text
@@ -76,7 +88,7 @@ class AACCILScraper(Scraper):
         # 1) 'Page X of Y'
         page_span = soup.select_one(".wp-pagenavi .pages")
         if page_span:
-            m = re.search(r"Page\s+\d+\s+of\s+(\d+)", _text(page_span), re.I)
+            m = _PAGE_RX.search(_text(page_span))
             if m:
                 try:
                     return max(1, int(m.group(1)))
@@ -112,8 +124,7 @@ class AACCILScraper(Scraper):
             if not label or len(label) < 2:
                 continue
             # Filter out obvious non-names (rare, but safe)
-            lo = label.lower()
-            if lo in {"more info", "learn more", "view more", "view details", "details", "profile"}:
+            if label.lower() in IGNORE_LABELS:
                 continue
             names.append(label)
         return names
@@ -126,38 +137,43 @@ class AACCILScraper(Scraper):
                 print("[AACCIL DEBUG] Failed to fetch page 1")
             return
 
-        soup = BeautifulSoup(first_html, "html.parser")
-        last_page = self._detect_last_page(soup)
+        last_page = self._detect_last_page(BeautifulSoup(first_html, "lxml", parse_only=PAGINATION_STRAINER))
         if DEBUG:
             print(f"[AACCIL DEBUG] detected last_page={last_page}")
 
         seen: Set[str] = set()
         yielded = 0
 
-        # 2) Iterate pages
-        for p in range(1, last_page + 1):
-            page_url = _page_url(self.url, p)
-            html = first_html if p == 1 else self._fetch_html(page_url)
-            if not html:
-                if DEBUG:
-                    print(f"[AACCIL DEBUG] skip p{p}: fetch failed")
-                continue
-
-            psoup = soup if p == 1 else BeautifulSoup(html, "html.parser")
-            page_names = self._extract_names_from_page(psoup)
-
-            if DEBUG:
-                print(f"[AACCIL DEBUG] p{p}: found {len(page_names)} names")
-
-            for name in page_names:
-                key = name.lower()
-                if key in seen:
+        # 2) Fetch pages 2..N in parallel, consume in page order so dedup stays deterministic
+        pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS)
+        try:
+            futures = {
+                p: pool.submit(self._fetch_html, _page_url(self.url, p))
+                for p in range(2, last_page + 1)
+            }
+            for p in range(1, last_page + 1):
+                html = first_html if p == 1 else futures[p].result()
+                if not html:
+                    if DEBUG:
+                        print(f"[AACCIL DEBUG] skip p{p}: fetch failed")
                     continue
-                seen.add(key)
 
-                yield {"name": name, "website": None}
-                yielded += 1
-                if max_items and yielded >= max_items:
-                    return
+                psoup = BeautifulSoup(html, "lxml", parse_only=ANCHOR_STRAINER)
+                page_names = self._extract_names_from_page(psoup)
 
-            time.sleep(REQUEST_DELAY)
+                if DEBUG:
+                    print(f"[AACCIL DEBUG] p{p}: found {len(page_names)} names")
+
+                for name in page_names:
+                    key = name.lower()
+                    if key in seen:
+                        continue
+                    seen.add(key)
+
+                    yield {"name": name, "website": None}
+                    yielded += 1
+                    if max_items and yielded >= max_items:
+                        return
+        finally:
+            # Don't keep crawling pages nobody will read
+            pool.shutdown(wait=False, cancel_futures=True)
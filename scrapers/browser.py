@@ -0,0 +1,80 @@
+from __future__ import annotations
+import atexit
+
+
+# Name scrapers only need DOM text; skip the heavy bytes
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font", "stylesheet"})
+
+
+def block_heavy_resources(route):
+    """`page.route("**/*", ...)` handler that aborts non-essential downloads."""
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        route.abort()
+    else:
+        route.continue_()
+
+
+# Trimmed visible text of every matched element, read straight from the live DOM
+TEXTS_JS = "els => els.map(e => (e.innerText || e.textContent || '').trim())"
+
+_COUNT_JS = "sel => document.querySelectorAll(sel).length"
+_GREW_JS = "([sel, n]) => document.querySelectorAll(sel).length > n"
+
+
+def scroll_until_stable(page, selector: str, max_idle: int = 3, poll_timeout_ms: int = 1500, max_rounds: int = 60) -> int:
+    """
+    Scroll to the bottom until `selector` stops matching more elements:
+    each round waits (up to `poll_timeout_ms`) for the count to grow and
+    stops after `max_idle` rounds in a row with no new items.
+    Returns the final match count.
+    """
+    from playwright.sync_api import TimeoutError as PWTimeout
+
+    last = page.evaluate(_COUNT_JS, selector)
+    idle = 0
+    for _ in range(max_rounds):
+        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        try:
+            page.wait_for_function(_GREW_JS, arg=[selector, last], timeout=poll_timeout_ms)
+            idle = 0
+        except PWTimeout:
+            idle += 1
+            if idle >= max_idle:
+                break
+        last = page.evaluate(_COUNT_JS, selector)
+    return last
+
+
+class _PW:
+    pw = None
+    browser = None
+
+
+def get_browser():
+    """
+    Shared headless chromium, launched on first use. Callers must
+    close_browser() once scraping is done (main.run does, right after the
+    scrape loop); the atexit hook is only a fallback.
+    Scrapers get isolation from their own context (`browser.new_context()`).
+    """
+    if _PW.browser is None:
+        # Imported lazily: Playwright is heavy and only needed once a scrape starts
+        from playwright.sync_api import sync_playwright
+
+        _PW.pw = sync_playwright().start()
+        _PW.browser = _PW.pw.chromium.launch(headless=True)
+        atexit.register(close_browser)
+    return _PW.browser
+
+
+def close_browser():
+    try:
+        if _PW.browser is not None:
+            _PW.browser.close()
+        if _PW.pw is not None:
+            _PW.pw.stop()
+    except Exception:
+        pass  # best-effort at shutdown
+    finally:
+        _PW.pw = None
+        _PW.browser = None
@@ -1,12 +1,9 @@
 from __future__ import annotations
 import os, time
-from typing import Iterable, Optional, List
-
-from playwright.sync_api import sync_playwright, TimeoutError as PWTimeout
-from bs4 import BeautifulSoup, Tag
-from urllib.parse import urlparse
+from typing import Iterable, List
 
 from scraper_base import Scraper, Company
+from scrapers.browser import TEXTS_JS, block_heavy_resources, get_browser, scroll_until_stable
 
 DEFAULT_NAME_SELECTOR = "p.font-semibold.text-gray-700.mt-2.leading-snug"
 ALT_NAME_SELECTORS = [
@@ -17,9 +14,6 @@ ALT_NAME_SELECTORS = [
 
 DEBUG = os.getenv("SCRAPER_DEBUG", "0") == "1"
 
-def _text(el: Tag) -> str:
-    return (el.get_text(strip=True) or "").strip()
-
 class USPAACCScraper(Scraper):
     """
     Playwright-based scraper for USPAACC Members (names only).
@@ -32,53 +26,36 @@ class USPAACCScraper(Scraper):
         self.alt_selectors = list(dict.fromkeys([self.name_selector] + ALT_NAME_SELECTORS))
 
     def _open_page(self):
-        pw = sync_playwright().start()
-        browser = pw.chromium.launch(headless=True)
-        ctx = browser.new_context()
+        ctx = get_browser().new_context()
         page = ctx.new_page()
-        return pw, browser, ctx, page
+        page.route("**/*", block_heavy_resources)
+        return ctx, page
 
-    def _close_page(self, pw, browser, ctx):
-        try:
-            ctx.close()
-            browser.close()
-        finally:
-            pw.stop()
+    def _close_page(self, ctx):
+        ctx.close()
 
     def iter_companies(self, max_items: int | None = None) -> Iterable[Company]:
-        pw, browser, ctx, page = self._open_page()
+        ctx, page = self._open_page()
         try:
             page.goto(self.url, wait_until="domcontentloaded", timeout=60000)
 
-            # Scroll to load more
-            prev_h = 0
-            for _ in range(20):
-                page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                page.wait_for_timeout(700)
-                cur_h = page.evaluate("document.body.scrollHeight")
-                if cur_h == prev_h:
-                    break
-                prev_h = cur_h
-
-            page.wait_for_load_state("networkidle", timeout=6000)
-            html = page.content()
-            soup = BeautifulSoup(html, "html.parser")
+            # Scroll to load more, until no new name nodes show up
+            scroll_until_stable(page, ", ".join(self.alt_selectors), max_rounds=20)
 
-            nodes = []
+            names: List[str] = []
             chosen = ""
             for css in self.alt_selectors:
-                nodes = soup.select(css)
-                if nodes:
+                names = page.eval_on_selector_all(css, TEXTS_JS)
+                if names:
                     chosen = css
                     break
 
             if DEBUG:
-                print(f"[DEBUG] name_nodes found: {len(nodes)} using selector: {chosen}")
+                print(f"[DEBUG] name_nodes found: {len(names)} using selector: {chosen}")
 
             seen = set()
             count = 0
-            for el in nodes:
-                name = _text(el)
+            for name in names:
                 if not name or name.lower() in seen:
                     continue
                 seen.add(name.lower())
@@ -89,4 +66,4 @@ class USPAACCScraper(Scraper):
                     break
                 time.sleep(0.02)
         finally:
-            self._close_page(pw, browser, ctx)
+            self._close_page(ctx)
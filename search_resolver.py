@@ -1,68 +1,151 @@
 from __future__ import annotations
+import asyncio
+import atexit
+import functools
 import os
 import re
 import json
+import mmap
 import pathlib
-from typing import List, Optional, Dict
+import threading
+from typing import List, Optional, Dict, Tuple
+from urllib.parse import urlsplit
 
 import httpx
 import backoff
+import orjson
 import tldextract
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
 
 # -------------------------
 # Config & small utilities
 # -------------------------
 
 # Common “non-official” domains to de-prioritize
-SOCIAL_HOSTS = {
+SOCIAL_HOSTS = frozenset({
     "linkedin.com","facebook.com","instagram.com","x.com","twitter.com",
     "youtube.com","crunchbase.com","bloomberg.com","zoominfo.com",
     "manta.com","yelp.com","glassdoor.com","indeed.com","angel.co",
     "wikipedia.org","maps.google.com","google.com","goo.gl"
-}
+})
+# Subdomain suffixes (".linkedin.com", ...) for a single str.endswith check
+_SOCIAL_HOSTS_ENDS = tuple("." + s for s in SOCIAL_HOSTS)
 
 # Blacklist obvious non-targets
-BLACKLIST_SUBSTR = {
+BLACKLIST_SUBSTR = frozenset({
     "eventbrite","hubspot","forms.gle","zoom.us"
-}
+})
+# Single alternation so a URL is scanned once rather than once per needle
+_BLACKLIST_RE = re.compile("|".join(re.escape(s) for s in BLACKLIST_SUBSTR))
 
 # On-disk cache to avoid re-querying the same name
 CACHE_PATH = pathlib.Path(os.getenv("SEARCH_CACHE_PATH", ".search_cache.json"))
+
+def _load_cache() -> Dict[str, str]:
+    """Parse the cache straight from a read-only mmap (no intermediate str copy)."""
+    if not CACHE_PATH.exists() or CACHE_PATH.stat().st_size == 0:
+        return {}
+    with open(CACHE_PATH, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            data = orjson.loads(view)
+    return data if isinstance(data, dict) else {}
+
 try:
-    _CACHE: Dict[str, str] = json.loads(CACHE_PATH.read_text()) if CACHE_PATH.exists() else {}
+    _CACHE: Dict[str, str] = _load_cache()
 except Exception:
     _CACHE = {}
+# resolve() may be called from several pipeline threads at once
+_CACHE_LOCK = threading.Lock()
+# New entries are written in batches (and at exit) instead of rewriting the file per name
+CACHE_FLUSH_EVERY = int(os.getenv("SEARCH_CACHE_FLUSH_EVERY", "50"))
+_CACHE_DIRTY = 0
+
+def _write_cache_locked() -> None:
+    """Write the cache to disk (best-effort). Caller holds _CACHE_LOCK."""
+    global _CACHE_DIRTY
+    try:
+        CACHE_PATH.write_text(json.dumps(_CACHE))
+        _CACHE_DIRTY = 0
+    except Exception:
+        pass
+
+def _remember(name: str, url: Optional[str]) -> None:
+    global _CACHE_DIRTY
+    with _CACHE_LOCK:
+        _CACHE[name] = url or ""
+        _CACHE_DIRTY += 1
+        if _CACHE_DIRTY >= CACHE_FLUSH_EVERY:
+            _write_cache_locked()
+
+def flush_cache() -> None:
+    """Persist any unsaved cache entries."""
+    with _CACHE_LOCK:
+        if _CACHE_DIRTY:
+            _write_cache_locked()
+
+atexit.register(flush_cache)
+
+# One extractor for the process, built from the bundled suffix-list snapshot
+# (no network fetch, no on-disk cache lookups)
+_TLDX = tldextract.TLDExtract(suffix_list_urls=(), fallback_to_snapshot=True, cache_dir=None)
+
+_PUNCT_RE = re.compile(r"[,.\-&/|]+")
+_STOP_RE = re.compile(
+    r"\b(incorporated|inc|co|corp|corporation|llc|l\.l\.c|ltd|limited|group|holdings|partners|technologies|technology|tech|systems|solutions|services|company)\b"
+)
+_WS_RE = re.compile(r"\s+")
 
+@functools.lru_cache(maxsize=100_000)
 def normalize_company_name(s: str) -> str:
-    s = s.lower()
-    s = re.sub(r"[,.\-&/|]+", " ", s)
-    s = re.sub(
-        r"\b(incorporated|inc|co|corp|corporation|llc|l\.l\.c|ltd|limited|group|holdings|partners|technologies|technology|tech|systems|solutions|services|company)\b",
-        "",
-        s,
-    )
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+    s = _PUNCT_RE.sub(" ", s.lower())
+    s = _STOP_RE.sub("", s)
+    return _WS_RE.sub(" ", s).strip()
 
+@functools.lru_cache(maxsize=50_000)
 def extract_registrable_host(url: str) -> str:
     try:
-        ext = tldextract.extract(url)
+        ext = _TLDX(url)
         if not ext.domain:
             return ""
         return ".".join([p for p in [ext.domain, ext.suffix] if p])
     except Exception:
         return ""
 
+def _hostname(url: str) -> str:
+    """Lower-cased hostname without a leading 'www.' ('' if unparsable)."""
+    try:
+        host = urlsplit(url).hostname or ""
+    except ValueError:
+        return ""
+    return host.removeprefix("www.")
+
+def _is_social_host(host: str) -> bool:
+    return host in SOCIAL_HOSTS or host.endswith(_SOCIAL_HOSTS_ENDS)
+
+@functools.lru_cache(maxsize=50_000)
+def host_core(url: str) -> str:
+    """
+    First label of the registrable domain ('acme' for https://www.acme.com/x).
+    Plain 'name.tld' hosts are split directly; anything with more labels
+    (subdomains, multi-part suffixes like .co.uk) falls back to tldextract.
+    """
+    host = _hostname(url)
+    labels = host.split(".")
+    if len(labels) == 2 and all(labels):
+        return labels[0]
+    reg = extract_registrable_host(url)
+    return reg.split(".")[0] if reg else ""
+
 def token_set_ratio(a: str, b: str) -> int:
-    return int(fuzz.token_set_ratio(a, b))
+    """Inputs must already be run through default_process (see score_candidate)."""
+    return int(fuzz.token_set_ratio(a, b, processor=None))
 
 def penalty_for_url(url: str) -> int:
-    u = url.lower()
-    host = extract_registrable_host(url)
-    if host in SOCIAL_HOSTS:
+    if _is_social_host(_hostname(url)):
         return -60
-    if any(x in u for x in BLACKLIST_SUBSTR):
+    u = url.lower()
+    if _BLACKLIST_RE.search(u):
         return -40
     # Penalize very deep paths and query fragments
     depth = u.count("/") - 2
@@ -70,22 +153,60 @@ def penalty_for_url(url: str) -> int:
     return - (depth * 4 + q * 5)
 
 def score_candidate(company_norm: str, title: str, url: str, snippet: str) -> float:
-    title = (title or "").lower()
-    snippet = (snippet or "").lower()
-    host = extract_registrable_host(url)
-    host_core = host.split(".")[0] if host else ""
-    sim_host = token_set_ratio(company_norm, host_core)
-    sim_title = token_set_ratio(company_norm, title)
+    # Preprocess each string once (lowercase, strip punctuation) instead of inside every scorer call
+    q = default_process(company_norm)
+    title = default_process(title or "")
+    snippet = default_process(snippet or "")
+    core = default_process(host_core(url))
+    # Empty fields score 0 anyway; don't spend a fuzz call on them
+    sim_host = token_set_ratio(q, core) if core else 0
+    sim_title = token_set_ratio(q, title) if title else 0
 
     score = 0.0
     score += 0.7 * sim_host
     score += 0.3 * sim_title
     if "official" in title or "home" in title:
         score += 5
-    score += min(8, token_set_ratio(company_norm, snippet) / 12)
+    if snippet:
+        score += min(8, token_set_ratio(q, snippet) / 12)
     score += penalty_for_url(url)
     return score
 
+def score_candidates(company_norm: str, cands: List[Tuple[str, str, str]]) -> List[float]:
+    """
+    Batch form of score_candidate for (title, url, snippet) triples: all
+    host/title/snippet similarities come from a single cdist call instead
+    of 3 scalar fuzz calls per candidate.
+    """
+    if not cands:
+        return []
+    n = len(cands)
+    q = default_process(company_norm)
+    titles = [default_process(t or "") for t, _, _ in cands]
+    snippets = [default_process(sn or "") for _, _, sn in cands]
+    hosts = [default_process(host_core(u)) for _, u, _ in cands]
+
+    # Only non-empty strings go to cdist; empty ones keep a similarity of 0
+    fields = hosts + titles + snippets
+    idx = [j for j, f in enumerate(fields) if f]
+    sims = [0] * len(fields)
+    if idx:
+        row = process.cdist([q], [fields[j] for j in idx], scorer=fuzz.token_set_ratio, processor=None)[0]
+        for j, v in zip(idx, row):
+            sims[j] = int(v)  # truncate like token_set_ratio() so both scorers agree
+
+    out: List[float] = []
+    for i, (_, url, _) in enumerate(cands):
+        title = titles[i]
+        score = 0.7 * sims[i] + 0.3 * sims[n + i]
+        if "official" in title or "home" in title:
+            score += 5
+        if snippets[i]:
+            score += min(8, sims[2 * n + i] / 12)
+        score += penalty_for_url(url)
+        out.append(score)
+    return out
+
 # -------------------------
 # Resolver implementation
 # -------------------------
@@ -100,15 +221,18 @@ class SearchResolver:
       - 1 query/company by default (keeps cost down)
       - On-disk JSON cache across runs
       - Tight HTTP timeouts + exponential backoff
+      - One pooled keep-alive HTTP client for all queries (call close() when done)
+      - resolve_many(): concurrent batch resolution on an async client
     """
 
-    def __init__(self):
+    def __init__(self, budget_secs: Optional[float] = None):
+        """
+        `budget_secs` caps one resolve(): retries and per-request timeouts are
+        derived from it so a search gives up instead of overrunning the budget.
+        """
         self.provider = os.getenv("SEARCH_PROVIDER", "google_cse").lower()
         self.debug = os.getenv("SEARCH_DEBUG", "0") == "1"
 
-        # Tight but reasonable timeouts
-        self._timeout = httpx.Timeout(connect=4.0, read=6.0, write=4.0, pool=4.0)
-
         if self.provider == "google_cse":
             self.key = os.getenv("GOOGLE_CSE_API_KEY")
             self.cx = os.getenv("GOOGLE_CSE_CX")
@@ -124,36 +248,66 @@ class SearchResolver:
         # Whether to run a second (optional) query per name
         self.extra_query = os.getenv("SEARCH_EXTRA_QUERY", "0") == "1"
 
-    @backoff.on_exception(backoff.expo, (httpx.HTTPError,), max_time=8, max_tries=3)
+        # Tight but reasonable timeouts. With a budget, each query gets an equal
+        # share: half for retrying (backoff max_time), half as the connect+read
+        # allowance of the attempt still in flight when retrying stops.
+        connect, read, max_time = 4.0, 6.0, 8.0
+        if budget_secs:
+            per_query = budget_secs / (2 if self.extra_query else 1)
+            connect, read, max_time = min(connect, per_query / 4), min(read, per_query / 4), min(max_time, per_query / 2)
+        self._timeout = httpx.Timeout(connect=connect, read=read, write=connect, pool=connect)
+        retry = backoff.on_exception(backoff.expo, (httpx.HTTPError,), max_time=max_time, max_tries=3)
+        self._http_json = retry(self._http_json)
+        self._ahttp_json = retry(self._ahttp_json)
+
+        # Reused across queries (and threads) so TLS handshakes are paid once per host
+        self._client = httpx.Client(
+            timeout=self._timeout,
+            headers={"User-Agent": "Mozilla/5.0"},
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=20, keepalive_expiry=30.0),
+        )
+
+    def close(self) -> None:
+        self._client.close()
+        flush_cache()
+
+    def __enter__(self) -> "SearchResolver":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # Wrapped with backoff per instance in __init__ (retry limits depend on the budget)
     def _http_json(self, url: str, params: Dict[str, str]) -> dict:
-        with httpx.Client(timeout=self._timeout, headers={"User-Agent": "Mozilla/5.0"}) as client:
-            r = client.get(url, params=params)
+        r = self._client.get(url, params=params)
+        if not r.is_success:
             r.raise_for_status()
-            return r.json()
+        return orjson.loads(r.content)
+
+    async def _ahttp_json(self, client: httpx.AsyncClient, url: str, params: Dict[str, str]) -> dict:
+        r = await client.get(url, params=params)
+        if not r.is_success:
+            r.raise_for_status()
+        return orjson.loads(r.content)
 
     # ---------- Providers ----------
-    def _google_cse(self, query: str) -> List[dict]:
-        try:
-            data = self._http_json(
+    def _request_for(self, query: str) -> Tuple[str, Dict[str, str]]:
+        if self.provider == "google_cse":
+            return (
                 "https://www.googleapis.com/customsearch/v1",
                 {"key": self.key, "cx": self.cx, "q": query, "num": "10"},
             )
-        except Exception:
-            return []
-        out = []
-        for it in data.get("items", [])[:10]:
-            out.append({"title": it.get("title"), "link": it.get("link"), "snippet": it.get("snippet")})
-        return out
+        return (
+            "https://serpapi.com/search.json",
+            {"engine": "google", "q": query, "api_key": self.key, "num": "10"},
+        )
 
-    def _serpapi(self, query: str) -> List[dict]:
-        try:
-            data = self._http_json(
-                "https://serpapi.com/search.json",
-                {"engine": "google", "q": query, "api_key": self.key, "num": "10"},
-            )
-        except Exception:
-            return []
+    def _parse_results(self, data: dict) -> List[dict]:
         out = []
+        if self.provider == "google_cse":
+            for it in data.get("items", [])[:10]:
+                out.append({"title": it.get("title"), "link": it.get("link"), "snippet": it.get("snippet")})
+            return out
         for it in data.get("organic_results", [])[:10]:
             out.append(
                 {
@@ -164,15 +318,53 @@ class SearchResolver:
             )
         return out
 
-    def _search(self, query: str) -> List[dict]:
-        return self._google_cse(query) if self.provider == "google_cse" else self._serpapi(query)
+    def _search(self, query: str) -> Optional[List[dict]]:
+        """Parsed results, or None if the request failed (as opposed to an empty result page)."""
+        try:
+            data = self._http_json(*self._request_for(query))
+        except Exception:
+            return None
+        return self._parse_results(data)
+
+    async def _asearch(self, client: httpx.AsyncClient, query: str) -> Optional[List[dict]]:
+        try:
+            data = await self._ahttp_json(client, *self._request_for(query))
+        except Exception:
+            return None
+        return self._parse_results(data)
+
+    # ---------- Scoring ----------
+    def _queries(self, company_name: str) -> List[str]:
+        queries = [f"{company_name} official site"]
+        if self.extra_query:
+            queries.append(f"{company_name} company")
+        return queries
+
+    def _pick_best(self, company_name: str, results: List[dict], min_score: int) -> Optional[str]:
+        name_norm = normalize_company_name(company_name)
+        best_url, best_score = None, -10_000.0
+
+        cands = [
+            (r.get("title") or "", url, r.get("snippet") or "")
+            for r in results
+            if (url := (r.get("link") or "").strip())
+        ]
+        for (title, url, _), s in zip(cands, score_candidates(name_norm, cands)):
+            if self.debug:
+                host = extract_registrable_host(url)
+                print(f"[SEARCH] {company_name} | {host:25} | score={s:.1f} | {title}")
+            if s > best_score:
+                best_score, best_url = s, url
+
+        return best_url if best_url and best_score >= min_score else None
 
     # ---------- Public ----------
     def resolve(self, company_name: str, min_score: int = 35) -> Optional[str]:
         """
         Conservative selection of the official site via search.
         Uses 1 query by default to save quota; opt-in a second query with SEARCH_EXTRA_QUERY=1.
-        Results are cached on disk to avoid repeat charges across runs.
+        Results are cached on disk to avoid repeat charges across runs
+        (flushed every CACHE_FLUSH_EVERY new entries and at exit).
         """
         if not company_name:
             return None
@@ -182,33 +374,75 @@ class SearchResolver:
         if cached is not None:
             return cached or None
 
-        name_norm = normalize_company_name(company_name)
-        queries = [f"{company_name} official site"]
-        if self.extra_query:
-            queries.append(f"{company_name} company")
+        results: List[dict] = []
+        complete = True
+        for q in self._queries(company_name):
+            hits = self._search(q)
+            if hits is None:
+                complete = False
+                continue
+            results.extend(hits)
+        res = self._pick_best(company_name, results, min_score)
 
-        best_url, best_score = None, -10_000.0
+        # A failed request is not a "no site" answer; only cache complete searches
+        if complete:
+            _remember(company_name, res)
+        return res
 
-        for q in queries:
-            results = self._search(q)
-            for r in results:
-                url = (r.get("link") or "").strip()
-                if not url:
-                    continue
-                s = score_candidate(name_norm, r.get("title") or "", url, r.get("snippet") or "")
-                if self.debug:
-                    host = extract_registrable_host(url)
-                    print(f"[SEARCH] {company_name} | {host:25} | score={s:.1f} | {r.get('title','')}")
-                if s > best_score:
-                    best_score, best_url = s, url
-
-        res = best_url if best_url and best_score >= min_score else None
-
-        # Persist cache (best-effort)
-        _CACHE[company_name] = res or ""
-        try:
-            CACHE_PATH.write_text(json.dumps(_CACHE))
-        except Exception:
-            pass
+    def resolve_many(self, names: List[str], min_score: int = 35, concurrency: int = 16) -> Dict[str, Optional[str]]:
+        """
+        Resolve many names at once: cache hits are answered directly and all
+        misses are searched concurrently (at most `concurrency` in flight).
+        The on-disk cache is written once at the end, not per name.
+        """
+        out: Dict[str, Optional[str]] = {}
+        misses: List[str] = []
+        for name in dict.fromkeys(n for n in names if n):
+            cached = _CACHE.get(name)
+            if cached is not None:
+                out[name] = cached or None
+            else:
+                misses.append(name)
 
-        return res
+        if misses:
+            resolved = asyncio.run(self._aresolve_all(misses, min_score, concurrency))
+            for name, (res, complete) in resolved.items():
+                out[name] = res
+                if complete:
+                    _remember(name, res)
+            flush_cache()
+
+        return out
+
+    def resolve_batch(self, names: List[str], min_score: int = 35, concurrency: int = 16) -> List[Optional[str]]:
+        """
+        Like resolve_many, but returns one URL (or None) per input name in the
+        original order. Repeated names are searched once.
+        """
+        found = self.resolve_many(names, min_score=min_score, concurrency=concurrency)
+        return [found.get(n) for n in names]
+
+    async def _aresolve_all(self, names: List[str], min_score: int, concurrency: int) -> Dict[str, Tuple[Optional[str], bool]]:
+        """name -> (best url or None, whether every query for it succeeded)."""
+        sem = asyncio.Semaphore(concurrency)
+        # httpx.AsyncClient can only be used on the loop it was created on, and
+        # resolve_many runs a fresh asyncio.run() each call, so open it here
+        async with httpx.AsyncClient(
+            timeout=self._timeout,
+            headers={"User-Agent": "Mozilla/5.0"},
+            limits=httpx.Limits(max_connections=32),
+        ) as client:
+            async def aresolve(name: str) -> Tuple[Optional[str], bool]:
+                async with sem:
+                    results: List[dict] = []
+                    complete = True
+                    for q in self._queries(name):
+                        hits = await self._asearch(client, q)
+                        if hits is None:
+                            complete = False
+                            continue
+                        results.extend(hits)
+                return self._pick_best(name, results, min_score), complete
+
+            found = await asyncio.gather(*(aresolve(n) for n in names))
+        return dict(zip(names, found))
@@ -1,6 +1,6 @@
 from __future__ import annotations
 import os
-from typing import List
+from typing import List, Optional
 import gspread
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
@@ -8,6 +8,17 @@ from google_auth_oauthlib.flow import InstalledAppFlow
 
 SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
 
+def _col_letter(col_idx: int) -> str:
+    """1 -> A, 2 -> B, 3 -> C, ..."""
+    s = ""
+    while col_idx:
+        col_idx, r = divmod(col_idx - 1, 26)
+        s = chr(65 + r) + s
+    return s
+
+# A..ZZ, indexed by col_idx - 1
+_COL_LETTERS = tuple(_col_letter(i) for i in range(1, 703))
+
 class SheetWriter:
     """
     OAuth (installed app) Sheets client.
@@ -41,52 +52,45 @@ class SheetWriter:
             self.worksheet = self.sheet.add_worksheet(title=tab_name, rows=2000, cols=10)
             # No header write, since you're starting at C5
 
-    # ---------- NEW HELPERS ----------
-    @staticmethod
-    def _col_letter(col_idx: int) -> str:
-        """1 -> A, 2 -> B, 3 -> C, ..."""
-        s = ""
-        while col_idx:
-            col_idx, r = divmod(col_idx - 1, 26)
-            s = chr(65 + r) + s
-        return s
+        # Next free row in C/D/E; looked up on first append, then advanced locally
+        self._next_row: Optional[int] = None
 
+    # ---------- NEW HELPERS ----------
     def _next_empty_row_cde(self, start_row: int = 5) -> int:
         """
-        Find the first row >= start_row where columns C, D, and E are all empty.
+        Find the first row >= start_row below the last non-empty cell in C, D, or E.
         Ignores other columns (e.g., B can have data).
         """
-        # Quick guess: one after the last non-empty among C/D/E
-        len_c = len(self.worksheet.col_values(3))  # up to last non-empty in col C
-        len_d = len(self.worksheet.col_values(4))
-        len_e = len(self.worksheet.col_values(5))
-        r = max(start_row, max(len_c, len_d, len_e) + 1)
+        # One read of the whole C:E block; the scan below is local
+        cde = self.worksheet.get("C1:E", value_render_option="UNFORMATTED_VALUE")
+        last = 0
+        for i, row in enumerate(cde, start=1):
+            if any(c is not None and str(c).strip() != "" for c in row):
+                last = i
+        return max(start_row, last + 1)
 
-        # Verify the guessed row is truly empty across C..E; if not, scan downward
-        while True:
-            vals = self.worksheet.get(f"C{r}:E{r}")  # returns [[]] or [] if empty
-            row = vals[0] if vals else []
-            # Treat missing cells as empty
-            cde_empty = all((i >= len(row) or str(row[i]).strip() == "") for i in range(3))
-            if cde_empty:
-                return r
-            r += 1
+    def refresh_next_row(self) -> None:
+        """Forget the cached next row (e.g. after the sheet was edited elsewhere)."""
+        self._next_row = None
 
     # ---------- UPDATED APPEND ----------
     def append_rows(self, rows: List[List[str]]):
         """
-        Appends rows to the first available row >= 5 where C/D/E are empty.
+        Appends rows to the first available row >= 5 below the existing C/D/E data.
         Each item in `rows` is [Name, Industry, Link] -> written to C, D, E.
         """
         if not rows:
             return
 
-        start_row = self._next_empty_row_cde(start_row=5)
+        if self._next_row is None:
+            self._next_row = self._next_empty_row_cde(start_row=5)
+        start_row = self._next_row
         start_col = 3  # column C
         end_col = start_col + len(rows[0]) - 1  # -> E for 3 cols
 
-        start_col_letter = self._col_letter(start_col)
-        end_col_letter = self._col_letter(end_col)
-        cell_range = f"{start_col_letter}{start_row}:{end_col_letter}{start_row + len(rows) - 1}"
+        # Explicit range rather than values.append: the server-side "table" detection
+        # isn't confined to C:E (column B may hold data) and can land in gaps
+        cell_range = f"{_COL_LETTERS[start_col - 1]}{start_row}:{_COL_LETTERS[end_col - 1]}{start_row + len(rows) - 1}"
 
         self.worksheet.update(cell_range, rows, value_input_option="RAW")
+        self._next_row = start_row + len(rows)
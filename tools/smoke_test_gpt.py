@@ -1,5 +1,5 @@
 from __future__ import annotations
-import os, sys, json
+import asyncio, os, sys, json
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -17,6 +17,8 @@ def main():
     if not cfg.openai_api_key:
         raise SystemExit("OPENAI_API_KEY missing. Add it to .env")
 
+    # Throwaway decision cache, so every run really calls the API
+    os.environ["GPT_CACHE_PATH"] = ":memory:"
     gpt = GPTFilter(api_key=cfg.openai_api_key, model=cfg.openai_model, thesis=cfg.search_thesis)
 
     # A small, mixed bag to see pass/fail and industry tagging
@@ -30,8 +32,9 @@ def main():
 
     print("MODEL:", cfg.openai_model)
     print("---- GPT Filter Smoke Test ----")
-    for c in samples:
-        decision = gpt.decide(c)  # expects {"include": bool, "industry_short": str}
+    # Same async path main.py uses: all samples in flight at once, not one call each
+    decisions = asyncio.run(gpt.decide_many(samples))  # each {"include": bool, "industry_short": str}
+    for c, decision in zip(samples, decisions):
         include = decision.get("include")
         industry = decision.get("industry_short")
         print(f"- {c['name']:<40}  include={include!s:<5}  industry='{industry}'")